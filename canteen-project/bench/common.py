@@ -0,0 +1,93 @@
+"""Helpers shared by the benchmark scripts."""
+import logging
+import os
+import re
+import sys
+import threading
+from collections import defaultdict
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCK_MARKERS = ("database is locked", "database table is locked")
+# Flask logs unhandled errors as "Exception on /checkout [POST]" plus the traceback
+EXCEPTION_LINE = re.compile(r"Exception on (\S+) \[(\w+)\]")
+
+
+def use_database(path):
+    """Point the app at a fresh SQLite file. Must run before `import app`."""
+    path = os.path.abspath(path)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    return os.environ["DATABASE_URL"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = -(-pct * len(sorted_values) // 100)  # ceil
+    return sorted_values[max(int(rank) - 1, 0)]
+
+
+def lock_errors_in_log(text):
+    """{"METHOD /path": n} for the SQLite lock errors in a server log."""
+    counts = defaultdict(int)
+    route = "unknown"
+    for line in text.splitlines():
+        match = EXCEPTION_LINE.search(line)
+        if match:
+            route = f"{match.group(2)} {match.group(1).split('?')[0]}"
+        elif any(marker in line for marker in LOCK_MARKERS) and "Error" in line:
+            counts[route] += 1
+    return counts
+
+
+class LockErrorCounter(logging.Handler):
+    """Counts the SQLite lock errors the app logs while it runs in-process."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        if record.exc_info and any(marker in str(record.exc_info[1]) for marker in LOCK_MARKERS):
+            self.count += 1
+
+
+class Recorder:
+    """Latency samples and error counts per route, safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.locked = defaultdict(int)
+
+    def add(self, route, seconds, ok=True, locked=False):
+        with self._lock:
+            self.samples[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+            if locked:
+                self.locked[route] += 1
+
+    def report(self, elapsed, out=sys.stdout, sequential=False):
+        """Print percentiles per route. With sequential=True (routes timed one after
+        another) req/s is per route's own time instead of the whole run."""
+        routes = sorted(self.samples)
+        width = max([len(r) for r in routes] + [5])
+        out.write(f"{'route':<{width}}  {'n':>6}  {'err':>5}  {'lock':>5}  "
+                  f"{'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'req/s':>8}\n")
+        total = 0
+        for route in routes:
+            values = sorted(self.samples[route])
+            total += len(values)
+            out.write(f"{route:<{width}}  {len(values):>6}  {self.errors[route]:>5}  {self.locked[route]:>5}  "
+                      f"{percentile(values, 50) * 1000:>8.1f}  {percentile(values, 95) * 1000:>8.1f}  "
+                      f"{percentile(values, 99) * 1000:>8.1f}  "
+                      f"{len(values) / (sum(values) if sequential else elapsed):>8.1f}\n")
+        out.write(f"{'total':<{width}}  {total:>6}  {sum(self.errors.values()):>5}  {sum(self.locked.values()):>5}  "
+                  f"{'':>8}  {'':>8}  {'':>8}  {total / elapsed:>8.1f}\n")
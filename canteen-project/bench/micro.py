@@ -0,0 +1,95 @@
+"""Per-route micro-benchmarks through the Flask test client: one process, no
+network, so the numbers are the app's own cost (routing, queries, templates).
+
+    python bench/micro.py --requests 200 --history 20000
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from common import LockErrorCounter, Recorder, use_database
+from seed import BENCH_PASSWORD, seed
+
+
+def login(app, username, password):
+    client = app.test_client()
+    client.post("/login", data={"username": username, "password": password})
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "canteen-micro.db"))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=5000)
+    parser.add_argument("--open", type=int, default=200, dest="open_orders")
+    args = parser.parse_args()
+
+    use_database(args.db)
+    app_module = seed(args.users, args.history, args.open_orders)
+    app = app_module.app
+    # capacity is not what is measured here; every checkout should go through
+    app.config["SLOT_MAX_ORDERS"] = app.config["SLOT_MAX_ITEMS"] = 0
+
+    lock_errors = LockErrorCounter()
+    app.logger.addHandler(lock_errors)
+
+    Order, select = app_module.Order, app_module.select
+    with app.app_context():
+        # a student with open orders, so the status poll has tokens to look up
+        username = app_module.db.session.execute(select(Order.username).limit(1)).scalar() or "bench0"
+        tokens = ",".join(app_module.db.session.execute(
+            select(Order.token).where(Order.username == username).limit(5)).scalars()) or "NOTOKEN"
+    student = login(app, username, BENCH_PASSWORD)
+    owner = login(app, "canteen_admin", "admin123")
+    item_id = app_module.menu_catalogue.items()[0].id
+    slot = re.search(r'name="pickup_slot"[^>]*>\s*<option value="([^"]+)"',
+                     (student.post("/add_to_cart", data={"item_id": item_id, "quantity": 1}) and
+                      student.get("/checkout").get_data(as_text=True))).group(1)
+
+    def add_to_cart():
+        return student.post("/add_to_cart", data={"item_id": item_id, "quantity": 1})
+
+    def checkout():
+        add_to_cart()  # untimed below: the cart must not be empty
+        start = time.perf_counter()
+        resp = student.post("/checkout", data={"pickup_slot": slot, "payment_method": "Cash"})
+        return resp, time.perf_counter() - start
+
+    benchmarks = [
+        ("GET /menu", lambda: student.get("/menu")),
+        ("POST /add_to_cart", add_to_cart),
+        ("GET /cart", lambda: student.get("/cart")),
+        ("GET /checkout", lambda: student.get("/checkout")),
+        ("POST /checkout", checkout),
+        ("GET /user/orders", lambda: student.get("/user/orders")),
+        ("GET /api/orders/status", lambda: student.get(f"/api/orders/status?tokens={tokens}")),
+        ("GET /owner/dashboard", lambda: owner.get("/owner/dashboard")),
+        ("GET /owner/orders", lambda: owner.get("/owner/orders")),
+        ("GET /owner/orders?status=Pending", lambda: owner.get("/owner/orders?status=Pending")),
+        ("GET /owner/orders?status=Received", lambda: owner.get("/owner/orders?status=Received")),
+        ("GET /owner/prep", lambda: owner.get("/owner/prep")),
+        ("GET /owner/search", lambda: owner.get("/owner/search?q=bench1")),
+        ("GET /api/v1/owner/queue", lambda: owner.get("/api/v1/owner/queue")),
+        ("GET /board/snapshot", lambda: student.get("/board/snapshot")),
+    ]
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    for name, call in benchmarks:
+        for i in range(args.warmup + args.requests):
+            locks_before = lock_errors.count
+            start = time.perf_counter()
+            result = call()
+            resp, elapsed = result if isinstance(result, tuple) else (result, time.perf_counter() - start)
+            if i >= args.warmup:
+                recorder.add(name, elapsed, ok=resp.status_code < 400, locked=lock_errors.count > locks_before)
+    recorder.report(time.perf_counter() - started, sequential=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Lunch-bell rush against a real gunicorn. Every simulated student registers,
+logs in, opens the menu, fills a cart and checks out, all starting within a
+few seconds, while owner screens keep reloading the kitchen queue.
+
+    python bench/rush.py --students 300 --owners 4
+    python bench/rush.py --url http://127.0.0.1:5000   # an already running server
+
+Uses only the standard library: one thread and one cookie jar per student.
+"""
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+from common import PROJECT_DIR, Recorder, lock_errors_in_log, use_database
+from seed import seed
+
+SLOT_OPTION = re.compile(r'<option value="(\d{4}-\d\d-\d\dT[^"]+)"')
+ITEM_ID = re.compile(r'name="item_id" value="(\d+)"')
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Time each request on its own instead of following the redirect."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Browser:
+    def __init__(self, base_url, recorder, timeout):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), NoRedirect())
+
+    def request(self, route, path, data=None):
+        """(status, location, body); records latency under `route`."""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        start = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=self.timeout) as resp:
+                status, location, text = resp.status, None, resp.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as e:
+            status, location, text = e.code, e.headers.get("Location"), ""
+        except OSError:
+            status, location, text = 0, None, ""  # refused / timed out
+        self.recorder.add(route, time.perf_counter() - start, ok=0 < status < 400)
+        return status, location or "", text
+
+
+def student(base_url, recorder, outcomes, n, start_at, timeout):
+    b = Browser(base_url, recorder, timeout)
+    time.sleep(max(start_at - time.time(), 0))
+    username, password = f"rush{n}", "rush-pass"
+    b.request("POST /register", "/register", {"username": username, "password": password})
+    _, location, _ = b.request("POST /login", "/login", {"username": username, "password": password})
+    if not location.endswith("/menu"):
+        outcomes.append("login failed")
+        return
+    _, _, menu = b.request("GET /menu", "/menu")
+    item_ids = ITEM_ID.findall(menu) or ["1"]
+    for item_id in random.sample(item_ids, k=min(len(item_ids), random.randint(1, 3))):
+        b.request("POST /add_to_cart", "/add_to_cart", {"item_id": item_id, "quantity": random.randint(1, 2)})
+    _, _, page = b.request("GET /checkout", "/checkout")
+    slots = SLOT_OPTION.findall(page)
+    if not slots:
+        outcomes.append("no slot offered")
+        return
+    # most students want the first slots after the bell
+    slot = slots[min(int(random.expovariate(0.5)), len(slots) - 1)]
+    status, location, _ = b.request("POST /checkout", "/checkout", {"pickup_slot": slot, "payment_method": "Cash"})
+    if "/order/confirmation" in location:
+        outcomes.append("placed")
+    elif "/order/pending" in location:
+        outcomes.append("queued")
+    elif location.endswith("/checkout"):
+        outcomes.append("slot full")
+    elif location.endswith("/cart"):
+        outcomes.append("kitchen busy")
+    else:
+        outcomes.append(f"error {status}")
+
+
+def owner(base_url, recorder, stop, interval, timeout):
+    b = Browser(base_url, recorder, timeout)
+    b.request("POST /login (owner)", "/login", {"username": "canteen_admin", "password": "admin123"})
+    while not stop.is_set():
+        b.request("GET /owner/orders?status=Pending", "/owner/orders?status=Pending")
+        b.request("GET /owner/dashboard", "/owner/dashboard")
+        b.request("GET /owner/prep", "/owner/prep")
+        stop.wait(interval)
+
+
+def start_server(port, workers, threads, log_path):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads))
+    log = open(log_path, "w")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=PROJECT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1).close()
+            return proc, base_url
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"gunicorn did not start; see {log_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of starting gunicorn")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "canteen-rush.db"))
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--owners", type=int, default=3, help="owner screens reloading the queue")
+    parser.add_argument("--owner-interval", type=float, default=1.0)
+    parser.add_argument("--ramp", type=float, default=3.0, help="students start within this many seconds")
+    parser.add_argument("--users", type=int, default=200, help="seeded accounts for the order history")
+    parser.add_argument("--history", type=int, default=5000)
+    parser.add_argument("--open", type=int, default=200, dest="open_orders")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request client timeout")
+    args = parser.parse_args()
+
+    proc, log_path = None, None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        use_database(args.db)
+        seed(args.users, args.history, args.open_orders)
+        log_path = os.path.splitext(args.db)[0] + "-gunicorn.log"
+        proc, base_url = start_server(args.port, args.workers, args.threads, log_path)
+
+    recorder, outcomes, stop = Recorder(), [], threading.Event()
+    owners = [threading.Thread(target=owner, args=(base_url, recorder, stop, args.owner_interval, args.timeout))
+              for _ in range(args.owners)]
+    bell = time.time() + 1.0
+    students = [threading.Thread(target=student, args=(base_url, recorder, outcomes, n,
+                                                       bell + random.uniform(0, args.ramp), args.timeout))
+                for n in range(args.students)]
+    try:
+        for t in owners + students:
+            t.start()
+        for t in students:
+            t.join()
+        elapsed = time.time() - bell
+        stop.set()
+        for t in owners:
+            t.join()
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(10)
+
+    recorder.report(elapsed)
+    print()
+    print("checkouts: " + ", ".join(f"{outcomes.count(o)} {o}" for o in sorted(set(outcomes))))
+    print(f"{args.students} students in {elapsed:.1f}s")
+    if log_path:
+        locks = lock_errors_in_log(open(log_path).read())
+        print("SQLite lock errors: " + (", ".join(f"{r} {n}" for r, n in sorted(locks.items())) or "none"))
+        print(f"server log: {log_path}")
+
+
+if __name__ == "__main__":
+    main()
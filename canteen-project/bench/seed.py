@@ -0,0 +1,92 @@
+"""Seed a benchmark database: student accounts, archived order history and a
+live kitchen queue.
+
+    python bench/seed.py --db /tmp/canteen-bench.db --users 500 --history 20000 --open 300
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from common import use_database
+
+BENCH_PASSWORD = "bench-pass"
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "canteen-bench.db")
+
+
+def _order_rows(app_module, count, users, statuses, when, rng):
+    """Column values for `count` orders plus their items, ready for bulk inserts."""
+    menu = app_module.menu_catalogue.items()
+    orders, items = [], []
+    for _ in range(count):
+        picked = rng.sample(menu, k=rng.randint(1, 3))
+        lines = [(m, rng.randint(1, 3)) for m in picked]
+        pickup_dt = when(rng)
+        orders.append(dict(username=f"bench{rng.randrange(max(users, 1))}",
+                           total_price=sum(m.price * qty for m, qty in lines),
+                           status=rng.choice(statuses),
+                           token=app_module.token_allocator.allocate(),
+                           payment_method="Cash", payment_status="Not Paid",
+                           pickup_time=pickup_dt.strftime("%I:%M %p"), pickup_dt=pickup_dt,
+                           created_at=pickup_dt, updated_at=pickup_dt))
+        items.append(lines)
+    return orders, items
+
+
+def _insert_orders(app_module, orders, items):
+    db, Order, OrderItem = app_module.db, app_module.Order, app_module.OrderItem
+    for fields, lines in zip(orders, items):
+        o = Order(items=[OrderItem(menu_item_id=m.id, name=m.name, qty=qty, price=m.price) for m, qty in lines],
+                  **fields)
+        db.session.add(o)
+    db.session.commit()
+
+
+def seed(users=200, history=5000, open_orders=200, batch=1000, rng_seed=42):
+    """Create users bench0..benchN-1, `history` archived orders and `open_orders` live ones."""
+    import app as app_module
+    from werkzeug.security import generate_password_hash
+    from datetime import datetime, timedelta
+
+    rng = random.Random(rng_seed)
+    app, db = app_module.app, app_module.db
+    with app.app_context():
+        # password hashing is deliberately slow, so every bench user shares one hash
+        password_hash = generate_password_hash(BENCH_PASSWORD)
+        for start in range(0, users, batch):
+            db.session.execute(app_module.User.__table__.insert(), [
+                {"username": f"bench{i}", "password_hash": password_hash}
+                for i in range(start, min(start + batch, users))])
+        db.session.commit()
+
+        # history goes through the real archiver so ids and tokens stay consistent
+        now = datetime.now()
+        past = lambda r: now - timedelta(days=r.uniform(1, 120), minutes=r.randrange(0, 600))
+        for start in range(0, history, batch):
+            _insert_orders(app_module, *_order_rows(app_module, min(batch, history - start), users,
+                                                    ("Received", "Received", "Received", "Deleted"), past, rng))
+            while app_module.archive_orders_batch(batch):
+                pass
+
+        soon = lambda r: now + timedelta(minutes=r.randrange(5, 240))
+        _insert_orders(app_module, *_order_rows(app_module, open_orders, users,
+                                                ("Pending", "Pending", "Preparing", "Ready"), soon, rng))
+        db.session.remove()
+    return app_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite file to (re)create")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=5000, help="archived orders")
+    parser.add_argument("--open", type=int, default=200, dest="open_orders", help="live queue orders")
+    args = parser.parse_args()
+    print(use_database(args.db))
+    seed(args.users, args.history, args.open_orders)
+    print(f"seeded {args.users} users, {args.history} archived and {args.open_orders} open orders "
+          f"(password {BENCH_PASSWORD!r})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# gunicorn settings for the canteen app (used by the Procfile).
+#
+# The app keeps per-process state: the SSE order stream, dashboard counters,
+# the menu catalogue and the order intake writer. SQLite also allows only one
+# writer at a time, so a few processes with many threads work best:
+#
+#   workers  - processes; each gets its own intake writer and caches (default 2)
+#   threads  - requests served concurrently per process; open SSE streams each
+#              hold one thread (at most SSE_MAX_STREAMS per process)
+#
+# Keep SQLALCHEMY_ENGINE_OPTIONS["pool_size"] (app.py, or the env var
+# CANTEEN_SQLALCHEMY_ENGINE_OPTIONS='{"pool_size": 16, ...}') at least equal
+# to `threads`, so a request never waits on the pool for a connection.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+# SSE streams stay open; keep-alive comments are sent every 15s
+timeout = 60
+graceful_timeout = 30
+
+# Run the schema migrations and seeding once in the master instead of racing in every worker
+preload_app = True
+
+def on_starting(server):
+    # /metrics sums per-worker files; start this server's numbers from zero
+    from app import clear_metrics
+    clear_metrics()
+
+def post_fork(server, worker):
+    # pooled connections opened while preloading must not be shared with the forked workers
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
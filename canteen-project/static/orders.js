@@ -0,0 +1,28 @@
+// "Load more" for the order lists: fetch only the next page of cards and append it
+(function () {
+  const button = document.getElementById("load-more");
+  const list = document.getElementById("order-list");
+  if (!button || !list) return;
+
+  button.addEventListener("click", () => {
+    const url = new URL(window.location.href);
+    url.searchParams.set("after", button.dataset.next);
+    url.searchParams.set("partial", "1");
+    button.disabled = true;
+    fetch(url, { credentials: "same-origin" })
+      .then((resp) => {
+        const next = resp.headers.get("X-Next-Cursor");
+        return resp.text().then((html) => ({ html, next }));
+      })
+      .then(({ html, next }) => {
+        list.insertAdjacentHTML("beforeend", html);
+        if (next) {
+          button.dataset.next = next;
+          button.disabled = false;
+        } else {
+          button.remove();
+        }
+      })
+      .catch(() => { button.disabled = false; });
+  });
+})();
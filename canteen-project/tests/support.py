@@ -0,0 +1,67 @@
+"""Helpers shared by the tests: one throwaway SQLite database per test run."""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = tempfile.mkdtemp(prefix="canteen-tests-")
+atexit.register(shutil.rmtree, DB_DIR, True)
+
+# must be set before `import app`: the module creates and seeds the database on import
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'canteen.db')}"
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+import app as canteen  # noqa: E402
+
+# write orders inline and keep /metrics files out of the project's instance folder
+canteen.app.config.update(TESTING=True, ORDER_INTAKE_ASYNC=False, METRICS_ENABLED=False)
+
+OWNER = ("canteen_admin", "admin123")
+
+
+def reset():
+    """Empty the tables the tests write to (users and the menu stay)."""
+    db = canteen.db
+    for model in (canteen.CartLine, canteen.Cart, canteen.OrderItem, canteen.Order,
+                  canteen.ArchivedOrderItem, canteen.ArchivedOrder, canteen.PickupSlot, canteen.IntakeFailure):
+        db.session.execute(model.__table__.delete())
+    db.session.commit()
+    canteen.token_allocator._active = None
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test inside an app context against emptied order tables."""
+    def setUp(self):
+        ctx = canteen.app.app_context()
+        ctx.push()
+        self.addCleanup(ctx.pop)
+        self.addCleanup(canteen.db.session.remove)
+        reset()
+
+    def set_config(self, **values):
+        """Override app.config for this test only."""
+        for key, value in values.items():
+            self.addCleanup(canteen.app.config.__setitem__, key, canteen.app.config[key])
+            canteen.app.config[key] = value
+
+
+def add_order(username="student", pickup_dt=None, status="Pending", token=None, **fields):
+    """Insert one order directly, bypassing checkout; returns its id."""
+    order = canteen.Order(username=username, total_price=fields.pop("total_price", 10.0), status=status,
+                          token=token or canteen.token_allocator.allocate(),
+                          payment_method=fields.pop("payment_method", "Cash"),
+                          pickup_dt=pickup_dt or datetime.now(), **fields)
+    canteen.db.session.add(order)
+    canteen.db.session.commit()
+    return order.id
+
+
+def owner_client():
+    client = canteen.app.test_client()
+    client.post("/login", data={"username": OWNER[0], "password": OWNER[1]})
+    return client
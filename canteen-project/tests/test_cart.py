@@ -0,0 +1,112 @@
+"""Optimistic locking of the cart: a stale version must not overwrite a newer change."""
+import threading
+import unittest
+
+from support import AppTestCase, canteen
+
+USER = "cart_student"
+
+
+class CartSetQtyTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tea, self.samosa = canteen.MenuItem.query.order_by(canteen.MenuItem.id).limit(2).all()
+        canteen.cart_add(USER, self.tea, 2)
+        canteen.cart_add(USER, self.samosa, 1)
+
+    def cart(self):
+        canteen.db.session.expire_all()
+        return canteen.Cart.query.filter_by(username=USER).one()
+
+    def quantities(self):
+        return canteen.cart_contents(USER)[1]
+
+    def test_current_version_applies(self):
+        version = self.cart().version
+        self.assertTrue(canteen.cart_set_qty(USER, self.tea.id, 5, version))
+        cart = self.cart()
+        self.assertEqual(cart.version, version + 1)
+        self.assertEqual(cart.item_count, 6)
+        self.assertAlmostEqual(cart.total, 5 * self.tea.price + self.samosa.price)
+        self.assertEqual(self.quantities(), {str(self.tea.id): 5, str(self.samosa.id): 1})
+
+    def test_stale_version_conflicts_and_changes_nothing(self):
+        version = self.cart().version
+        canteen.cart_set_qty(USER, self.tea.id, 3, version)
+        # the same form submitted again still carries the old version
+        with self.assertRaises(canteen.CartConflict):
+            canteen.cart_set_qty(USER, self.samosa.id, 0, version)
+        cart = self.cart()
+        self.assertEqual(cart.version, version + 1)
+        self.assertEqual(cart.item_count, 4)
+        self.assertEqual(self.quantities(), {str(self.tea.id): 3, str(self.samosa.id): 1})
+
+    def test_stale_version_is_checked_by_the_update_itself(self):
+        # a writer that read the version before another one committed
+        cart_id, version = self.cart().id, self.cart().version
+        canteen.cart_add(USER, self.tea, 1)
+        self.assertFalse(canteen._bump_cart(cart_id, 100, 1, version))
+        canteen.db.session.rollback()
+        self.assertEqual(self.cart().item_count, 4)
+
+    def test_concurrent_updates_with_one_version(self):
+        version = self.cart().version
+        results = []
+
+        def update(qty):
+            with canteen.app.app_context():
+                try:
+                    results.append(canteen.cart_set_qty(USER, self.tea.id, qty, version))
+                except canteen.CartConflict:
+                    results.append("conflict")
+                finally:
+                    canteen.db.session.remove()
+
+        threads = [threading.Thread(target=update, args=(qty,)) for qty in range(3, 11)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(results.count("conflict"), len(threads) - 1)
+        cart = self.cart()
+        qty = self.quantities()[str(self.tea.id)]
+        # the totals match the one line change that won
+        self.assertEqual(cart.version, version + 1)
+        self.assertEqual(cart.item_count, qty + 1)
+        self.assertAlmostEqual(cart.total, qty * self.tea.price + self.samosa.price)
+
+    def test_zero_removes_the_line(self):
+        self.assertTrue(canteen.cart_set_qty(USER, self.samosa.id, 0, self.cart().version))
+        self.assertEqual(self.quantities(), {str(self.tea.id): 2})
+        self.assertEqual(self.cart().item_count, 2)
+
+    def test_missing_line_or_cart(self):
+        self.assertFalse(canteen.cart_set_qty(USER, 10 ** 6, 1))
+        self.assertFalse(canteen.cart_set_qty("nobody", self.tea.id, 1))
+
+    def api_client(self):
+        client = canteen.app.test_client()
+        with client.session_transaction() as sess:
+            sess["username"], sess["role"] = USER, "student"
+        return client
+
+    def test_api_answers_409_on_conflict(self):
+        client = self.api_client()
+        stale = self.cart().version - 1
+        resp = client.put(f"/api/v1/cart/lines/{self.tea.id}", json={"qty": 9, "version": stale})
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(self.quantities()[str(self.tea.id)], 2)
+
+    def test_api_add_rejects_a_non_integer_item_id(self):
+        client = self.api_client()
+        for item_id in ([self.tea.id], str(self.tea.id), True, None):
+            with self.subTest(item_id=item_id):
+                resp = client.post("/api/v1/cart/lines", json={"item_id": item_id})
+                self.assertEqual(resp.status_code, 400)
+        self.assertEqual(client.post("/api/v1/cart/lines", json=[1]).status_code, 400)
+        self.assertEqual(client.post("/api/v1/cart/lines", json={"item_id": self.tea.id}).status_code, 201)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+"""copy-db: a copied database never hands out an id that an archived order already has."""
+import os
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from support import DB_DIR, AppTestCase, add_order, canteen
+
+
+class CopyDbTest(AppTestCase):
+    def test_order_ids_continue_past_the_archive(self):
+        closed = [add_order(status="Received") for _ in range(3)]
+        self.assertEqual(canteen.archive_orders_batch(10), 3)
+        path = os.path.join(DB_DIR, "copy.db")
+        self.addCleanup(os.remove, path)
+        result = canteen.app.test_cli_runner().invoke(args=["copy-db", f"sqlite:///{path}"])
+        self.assertIsNone(result.exception, result.output)
+
+        target = create_engine(f"sqlite:///{path}")
+        self.addCleanup(target.dispose)
+        with target.begin() as conn:
+            conn.execute(canteen.Order.__table__.insert().values(
+                username="copy_student", total_price=10.0, status="Pending", token="NEW123",
+                payment_method="Cash", pickup_dt=canteen.datetime.now()))
+            new_id = conn.execute(text('SELECT MAX(id) FROM "order"')).scalar()
+        self.assertGreater(new_id, max(closed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Keyset pagination of the owner's order queue (?after=<pickup_dt>_<id>)."""
+import re
+import unittest
+from datetime import datetime, timedelta
+
+from support import AppTestCase, add_order, canteen, owner_client
+
+CARD_ID = re.compile(r'id="order-(\d+)"')
+
+
+class OwnerCursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        order = canteen.Order(id=42, pickup_dt=datetime(2024, 1, 2, 12, 30, 15, 250))
+        self.assertEqual(canteen.parse_owner_cursor(canteen.owner_cursor(order)),
+                         (datetime(2024, 1, 2, 12, 30, 15, 250), 42))
+
+    def test_malformed(self):
+        for cursor in (None, "", "42", "not-a-date_42", "2024-01-02T12:30:00_x"):
+            self.assertIsNone(canteen.parse_owner_cursor(cursor), cursor)
+
+
+class OwnerOrdersPagingTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_config(ORDERS_PAGE_SIZE=3)
+        base = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        # several orders share a pickup time, so the id has to break the tie
+        pickups = [base + timedelta(minutes=m) for m in (20, 0, 10, 0, 10, 0, 30, 10)]
+        self.ids = [add_order(pickup_dt=dt) for dt in pickups]
+        self.expected = [i for _, i in sorted(zip(pickups, self.ids))]
+        self.client = owner_client()
+
+    def fetch(self, **params):
+        resp = self.client.get("/owner/orders", query_string=dict(partial=1, **params))
+        self.assertEqual(resp.status_code, 200)
+        return [int(i) for i in CARD_ID.findall(resp.get_data(as_text=True))], resp.headers["X-Next-Cursor"]
+
+    def test_pages_cover_queue_once_in_pickup_order(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            ids, cursor = self.fetch(**({"after": cursor} if cursor else {}))
+            self.assertLessEqual(len(ids), 3)
+            seen += ids
+            pages += 1
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_new_order_before_cursor_is_not_repeated(self):
+        first, cursor = self.fetch()
+        # an order slotted in ahead of the cursor must not shift the next page
+        add_order(pickup_dt=datetime.now())
+        second, _ = self.fetch(after=cursor)
+        self.assertEqual(second, self.expected[3:6])
+        self.assertFalse(set(first) & set(second))
+
+    def test_bad_cursor_starts_from_the_top(self):
+        ids, cursor = self.fetch(after="garbage")
+        self.assertEqual(ids, self.expected[:3])
+        self.assertTrue(cursor)
+
+    def test_status_filter(self):
+        canteen.db.session.get(canteen.Order, self.expected[0]).status = "Preparing"
+        canteen.db.session.commit()
+        ids, cursor = self.fetch(status="Preparing")
+        self.assertEqual((ids, cursor), ([self.expected[0]], ""))
+
+
+class OwnerActionRedirectTest(AppTestCase):
+    def post(self, next_url):
+        order_id = add_order()
+        return owner_client().post("/owner/orders", data={"order_id": order_id, "action": "update",
+                                                          "status": "Preparing", "next": next_url})
+
+    def test_local_next_is_followed(self):
+        resp = self.post("/owner/search?q=AB12")
+        self.assertEqual(resp.headers["Location"], "/owner/search?q=AB12")
+
+    def test_offsite_next_falls_back_to_the_queue(self):
+        for next_url in ("//evil.example/x", "/\\evil.example/x", "https://evil.example/", "/\tevil"):
+            with self.subTest(next_url=next_url):
+                self.assertEqual(self.post(next_url).headers["Location"], "/owner/orders?status=")
+
+
+class OwnerStreamCapTest(AppTestCase):
+    def test_only_the_live_queue_opens_a_stream(self):
+        client = owner_client()
+        self.assertIn(b"EventSource", client.get("/owner/orders").data)
+        for status in canteen.ARCHIVE_FILTERS:
+            with self.subTest(status=status):
+                self.assertNotIn(b"EventSource", client.get(f"/owner/orders?status={status}").data)
+
+    def test_streams_past_the_cap_get_503_until_one_closes(self):
+        client = owner_client()
+        streams = [client.get("/owner/orders/stream") for _ in range(canteen.app.config["SSE_MAX_STREAMS"])]
+        self.addCleanup(lambda: [resp.close() for resp in streams])
+        self.assertEqual([resp.status_code for resp in streams], [200] * len(streams))
+        busy = client.get("/owner/orders/stream")
+        self.assertEqual(busy.status_code, 503)
+        self.assertIn("Retry-After", busy.headers)
+        streams.pop().close()
+        streams.append(client.get("/owner/orders/stream"))
+        self.assertEqual(streams[-1].status_code, 200)
+
+
+class OwnerPrepSheetTest(AppTestCase):
+    def test_partial_is_just_the_sheet(self):
+        resp = owner_client().get("/owner/prep?partial=1")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn(b"<script", resp.data)
+        self.assertNotIn(b"Prep Sheet", resp.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
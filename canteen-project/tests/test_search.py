@@ -0,0 +1,40 @@
+"""Counter search finds live orders and closed ones that were moved to the archive."""
+import unittest
+
+from support import AppTestCase, add_order, canteen, owner_client
+
+
+class SearchOrdersTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.live = add_order(username="search_live", token="LIV123")
+        self.closed = add_order(username="search_closed", token="OLD456", status="Received")
+        self.assertEqual(canteen.archive_orders_batch(10), 1)
+
+    def ids(self, q):
+        return [o.id for o in canteen.search_orders(q)]
+
+    def test_finds_archived_orders_by_token_username_and_id(self):
+        self.assertEqual(self.ids("old4"), [self.closed])
+        self.assertEqual(self.ids("search_closed"), [self.closed])
+        self.assertEqual(self.ids(str(self.closed)), [self.closed])
+
+    def test_live_orders_come_first(self):
+        self.assertEqual(self.ids("search_"), [self.live, self.closed])
+
+    def test_reused_token_lists_both_orders(self):
+        again = add_order(token="OLD456")
+        self.assertEqual(self.ids("OLD456"), [again, self.closed])
+
+    def test_number_too_long_for_an_id_is_not_an_error(self):
+        self.assertEqual(self.ids("9" * 20), [])
+        self.assertEqual(owner_client().get("/owner/search?q=" + "9" * 20).status_code, 200)
+
+    def test_archived_card_has_no_actions(self):
+        resp = owner_client().get("/owner/search?q=OLD456")
+        self.assertIn(b"Archived:", resp.data)
+        self.assertNotIn(b'name="action"', resp.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
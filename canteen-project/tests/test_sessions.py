@@ -0,0 +1,49 @@
+"""Server-side sessions are read from the store only by requests that use them."""
+import unittest
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from support import AppTestCase, owner_client
+
+
+class LazySessionTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = owner_client()
+        self.statements = []
+        event.listen(Engine, "before_cursor_execute", self.record)
+        self.addCleanup(event.remove, Engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if "server_session" in statement:
+            self.statements.append(statement.split()[0])
+
+    def test_board_polls_and_static_files_skip_the_store(self):
+        etag = self.client.get("/board/snapshot").headers["ETag"]
+        for _ in range(3):
+            resp = self.client.get("/board/snapshot", headers={"If-None-Match": etag})
+            self.assertEqual(resp.status_code, 304)
+        resp = self.client.get("/static/style.css")
+        resp.close()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.statements, [])
+
+    def test_pages_that_use_the_session_still_see_it(self):
+        resp = self.client.get("/owner/orders")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("SELECT", self.statements)
+
+    def test_reading_a_session_renews_its_expiry_at_most_once_per_interval(self):
+        self.client.get("/owner/orders")
+        self.statements.clear()
+        self.client.get("/owner/orders")
+        self.assertEqual(self.statements, ["SELECT"])
+        self.set_config(SESSION_REFRESH_SECONDS=0)
+        self.statements.clear()
+        self.client.get("/owner/orders")
+        self.assertEqual(self.statements, ["SELECT", "UPDATE"])
+
+
+if __name__ == "__main__":
+    unittest.main()
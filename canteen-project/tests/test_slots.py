@@ -0,0 +1,94 @@
+"""Pickup slot admission: the intake writer books the slot in the order's own transaction."""
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from support import AppTestCase, canteen
+
+MAX_ORDERS = 3
+
+
+class SlotAdmissionTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_config(SLOT_MAX_ORDERS=MAX_ORDERS, SLOT_MAX_ITEMS=0)
+        self.pickup_dt = canteen.floor_to_slot(datetime.now() + timedelta(hours=1), canteen.app.config["SLOT_MINUTES"])
+        item = canteen.MenuItem.query.first()
+        self.items = [{"id": item.id, "name": item.name, "qty": 1, "price": item.price}]
+
+    def submit(self, username):
+        fields = canteen.new_order_fields(username, 10.0, "Cash", "Not Paid", None, self.pickup_dt)
+        return canteen.submit_order(fields, self.items)
+
+    def slot(self):
+        canteen.db.session.expire_all()
+        return canteen.db.session.get(canteen.PickupSlot, self.pickup_dt)
+
+    def test_full_slot_fails_the_ticket_and_frees_its_token(self):
+        for i in range(MAX_ORDERS):
+            self.assertEqual(self.submit(f"slot_student{i}").state, "placed")
+        ticket = self.submit("slot_late")
+        self.assertEqual((ticket.state, ticket.error), ("failed", canteen.SLOT_FULL))
+        self.assertNotIn(ticket.token, canteen.token_allocator._active)
+        self.assertEqual(self.slot().order_count, MAX_ORDERS)
+        self.assertEqual(canteen.Order.query.count(), MAX_ORDERS)
+
+    def test_concurrent_checkouts_do_not_overbook(self):
+        # every thread writes inline, like the intake writers of separate workers
+        results = []
+
+        def checkout(i):
+            with canteen.app.app_context():
+                try:
+                    ticket = self.submit(f"slot_student{i}")
+                    results.append(ticket.error or "placed")
+                finally:
+                    canteen.db.session.remove()
+
+        threads = [threading.Thread(target=checkout, args=(i,)) for i in range(MAX_ORDERS * 3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results.count("placed"), MAX_ORDERS)
+        self.assertEqual(results.count(canteen.SLOT_FULL), len(threads) - MAX_ORDERS)
+        self.assertEqual(self.slot().order_count, MAX_ORDERS)
+        self.assertEqual(canteen.Order.query.count(), MAX_ORDERS)
+
+    def test_checkout_page_answers_slot_full(self):
+        for i in range(MAX_ORDERS):
+            self.submit(f"slot_student{i}")
+        fields = canteen.new_order_fields("slot_late", 10.0, "Cash", "Not Paid", None, self.pickup_dt)
+        with canteen.app.test_request_context():
+            resp = canteen.redirect_after_intake(canteen.submit_order(fields, self.items), "placed")
+        self.assertEqual(resp.headers["Location"], "/checkout")
+
+    def fill_cart(self, username):
+        canteen.cart_add(username, canteen.MenuItem.query.first(), 2)
+
+    def cart_count(self, username):
+        canteen.db.session.expire_all()
+        return canteen.Cart.query.filter_by(username=username).one().item_count
+
+    def test_placed_order_empties_the_cart(self):
+        self.fill_cart("slot_student")
+        self.assertEqual(self.submit("slot_student").state, "placed")
+        self.assertEqual(self.cart_count("slot_student"), 0)
+
+    def test_failed_order_keeps_the_cart_and_any_worker_reports_it(self):
+        for i in range(MAX_ORDERS):
+            self.submit(f"slot_student{i}")
+        self.fill_cart("slot_late")
+        ticket = self.submit("slot_late")
+        self.assertEqual(ticket.state, "failed")
+        self.assertEqual(self.cart_count("slot_late"), 2)
+        # another worker does not have the ticket in memory
+        canteen.order_intake._forget(ticket)
+        with canteen.app.test_request_context():
+            canteen.session["username"] = "slot_late"
+            state = canteen.intake_state(ticket.id, ticket.token)
+        self.assertEqual((state.state, state.error), ("failed", canteen.SLOT_FULL))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Order tokens: the unique-token migration and the intake's retry when another
+worker issued the same token first."""
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from support import AppTestCase, add_order, canteen
+
+
+def order_tokens():
+    canteen.db.session.expire_all()
+    return dict(canteen.db.session.execute(canteen.db.select(canteen.Order.id, canteen.Order.token)).all())
+
+
+class MigrateUniqueTokensTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        # a database from before the migration: no unique index, duplicated tokens
+        canteen.db.session.execute(text("DROP INDEX ux_order_token"))
+        canteen.db.session.commit()
+        self.addCleanup(self.restore_index)
+
+    def restore_index(self):
+        canteen.db.session.rollback()
+        reset_tokens = canteen.Order.__table__.delete()
+        canteen.db.session.execute(reset_tokens)
+        canteen._create_indexes(canteen.Order.__table__, "ux_order_token")
+        canteen.db.session.commit()
+
+    def test_keeps_the_oldest_and_reissues_the_rest(self):
+        first = [add_order(token="ABC123") for _ in range(3)]
+        second = [add_order(token="XYZ789") for _ in range(2)]
+        single = add_order(token="QRS456")
+        canteen._migrate_unique_tokens()
+        canteen.db.session.commit()
+
+        tokens = order_tokens()
+        self.assertEqual(len(set(tokens.values())), len(tokens))
+        self.assertEqual((tokens[first[0]], tokens[second[0]], tokens[single]), ("ABC123", "XYZ789", "QRS456"))
+        self.assertNotIn(tokens[first[1]], ("ABC123", "XYZ789", "QRS456"))
+
+        index_names = {ix["name"] for ix in inspect(canteen.db.engine).get_indexes("order")}
+        self.assertIn("ux_order_token", index_names)
+        with self.assertRaises(IntegrityError):
+            add_order(token="ABC123")
+
+    def test_no_duplicates_is_a_no_op(self):
+        ids = [add_order(token=t) for t in ("AAA111", "BBB222")]
+        canteen._migrate_unique_tokens()
+        canteen.db.session.commit()
+        self.assertEqual(order_tokens(), dict(zip(ids, ("AAA111", "BBB222"))))
+
+
+class TokenAllocatorTest(AppTestCase):
+    def test_skips_tokens_in_the_table(self):
+        add_order(token="TAKEN1")
+        allocator = canteen.TokenAllocator()
+        with mock.patch.object(canteen, "generate_token", side_effect=["TAKEN1", "TAKEN1", "FREE01"]):
+            self.assertEqual(allocator.allocate(), "FREE01")
+
+    def test_released_token_can_be_issued_again(self):
+        allocator = canteen.TokenAllocator()
+        with mock.patch.object(canteen, "generate_token", side_effect=["ONE111", "ONE111", "TWO222"]):
+            self.assertEqual(allocator.allocate(), "ONE111")
+            self.assertEqual(allocator.allocate(), "TWO222")
+        allocator.release("ONE111")
+        with mock.patch.object(canteen, "generate_token", return_value="ONE111"):
+            self.assertEqual(allocator.allocate(), "ONE111")
+
+    def test_gives_up_when_every_draw_is_taken(self):
+        allocator = canteen.TokenAllocator()
+        with mock.patch.object(canteen, "generate_token", return_value="SAME11"):
+            allocator.allocate()
+            with self.assertRaises(canteen.NoFreeToken):
+                allocator.allocate()
+
+
+class IntakeTokenRetryTest(AppTestCase):
+    def fields(self, token):
+        pickup_dt = datetime.now() + timedelta(hours=1)
+        return canteen.new_order_fields("token_student", 10.0, "Cash", "Not Paid", None, pickup_dt) | {"token": token}
+
+    def items(self):
+        item = canteen.MenuItem.query.first()
+        return [{"id": item.id, "name": item.name, "qty": 1, "price": item.price}]
+
+    def test_clash_with_another_worker_gets_a_fresh_token(self):
+        # the allocator has loaded its set, then another worker writes an order
+        canteen.token_allocator.allocate()
+        other = add_order(token="CLASH1")
+        # built outside the patch: new_order_fields() draws a token of its own
+        fields = self.fields("CLASH1")
+        with mock.patch.object(canteen, "generate_token", return_value="FRESH1"):
+            ticket = canteen.order_intake.submit(fields, self.items())
+        self.assertEqual(ticket.state, "placed")
+        self.assertEqual(ticket.token, "FRESH1")
+        tokens = order_tokens()
+        self.assertEqual((tokens[other], tokens[ticket.order_id]), ("CLASH1", "FRESH1"))
+
+    def test_gives_up_after_token_attempts(self):
+        canteen.token_allocator.allocate()
+        add_order(token="CLASH1")
+        fields = self.fields("CLASH1")
+        # every reissued token clashes too (a stale in-memory set)
+        with mock.patch.object(canteen.OrderTicket, "reissue_token",
+                               lambda ticket: None), \
+             mock.patch.object(canteen.token_allocator, "release") as release:
+            ticket = canteen.order_intake.submit(fields, self.items())
+        self.assertEqual(ticket.state, "failed")
+        release.assert_called_once_with("CLASH1")
+        self.assertEqual(len(order_tokens()), 1)
+        # the slot booking rolled back with the order
+        slot = canteen.db.session.get(canteen.PickupSlot,
+                                      canteen.floor_to_slot(fields["pickup_dt"], canteen.app.config["SLOT_MINUTES"]))
+        self.assertIsNone(slot)
+
+
+if __name__ == "__main__":
+    unittest.main()